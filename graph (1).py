@@ -11,14 +11,112 @@ This file is Copyright (c) 2024 Aroush Syed, Akshata Kulkarni, Rosanna Jiang, Ay
 """
 
 from __future__ import annotations
+import ast
+import functools
+import heapq
+import re
+import sys
 import uuid
-import csv
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from typing import Any, Iterable
+import numpy as np
 import nltk
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 from nltk.corpus import wordnet
 
+try:
+    from numba import njit, prange
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+    prange = range
+
+try:
+    from scipy import sparse
+    _SCIPY_AVAILABLE = True
+except ImportError:
+    _SCIPY_AVAILABLE = False
+
+# Built once at module load so the O(V^2) edge construction does not rebuild
+# these sets (and re-read the NLTK corpus from disk) for every pair of vertices.
+_STOP_WORDS = frozenset(stopwords.words('english'))
+_COLOURS = frozenset(['black', 'white', 'gold', 'silver', 'blue', 'red', 'orange', 'yellow', 'green', 'purple',
+                      'pink', 'brown', 'tan', 'beige'])
+_CLOTHES = frozenset(['shirt', 'short', 'skirt', 'dress', 'jacket', 'pants', 'leggings', 'jeans', 'top', 'bottom',
+                      'sweater', 'crop top', 'vest', 'underwear', 'shorts', 'sneakers', 'shoes'])
+
+# Vocabulary mapping every word seen so far to an integer id, so token sets can be
+# stored as int arrays and compared with NumPy instead of per-word Python loops.
+_VOCAB: dict[str, int] = {}
+
+# matches the quoted elements of a stringified list, for str_to_list's fallback
+_URL_RE = re.compile(r"'([^']*)'")
+
+# word tokenizer for the short product descriptions; NLTK's word_tokenize runs
+# full sentence + Treebank tokenization, which is overkill and far slower here
+_TOKEN_RE = re.compile(r"[A-Za-z]+")
+
+
+def _encode_tokens(words: Iterable[str]) -> np.ndarray:
+    """Return a sorted int32 array of vocabulary ids for the given words,
+    assigning fresh ids to words not seen before."""
+
+    ids = set()
+    for word in words:
+        word_id = _VOCAB.get(word)
+        if word_id is None:
+            word_id = len(_VOCAB)
+            _VOCAB[word] = word_id
+        ids.add(word_id)
+
+    return np.fromiter(sorted(ids), dtype=np.int32, count=len(ids))
+
+
+# The colour and clothing words get the first vocabulary ids at module load.
+_COLOUR_IDS = _encode_tokens(_COLOURS)
+_CLOTHES_IDS = _encode_tokens(_CLOTHES)
+
+
+def _score_kernel(new_ids: np.ndarray, flat_ids: np.ndarray, offsets: np.ndarray,
+                  colour_mask: np.ndarray, clothes_mask: np.ndarray, out: np.ndarray) -> None:
+    """Score the given token ids against every vertex token array packed in (flat_ids, offsets),
+    writing the results into out.
+
+    Each vertex i owns flat_ids[offsets[i]:offsets[i + 1]]. Both new_ids and each
+    vertex's slice are sorted, so the intersection is a two-pointer merge. Compiled
+    with Numba (parallel over vertices) when it is available."""
+
+    for i in prange(offsets.size - 1):  # pylint: disable=not-an-iterable
+        start = offsets[i]
+        end = offsets[i + 1]
+        a = 0
+        b = start
+        score = 0.0
+
+        while a < new_ids.size and b < end:
+            if new_ids[a] < flat_ids[b]:
+                a += 1
+            elif new_ids[a] > flat_ids[b]:
+                b += 1
+            else:
+                score += 1.0
+                if colour_mask[flat_ids[b]]:
+                    score += 1.0
+                if clothes_mask[flat_ids[b]]:
+                    score += 3.0
+                a += 1
+                b += 1
+
+        if end > start:
+            out[i] = score / (end - start)
+        else:
+            out[i] = 0.0
+
+
+if _NUMBA_AVAILABLE:
+    _score_kernel = njit(parallel=True, cache=True)(_score_kernel)
+
 
 class WeightedVertex:
     """A weighted vertex corresponding to a clothing item.
@@ -29,38 +127,99 @@ class WeightedVertex:
         - item_description: The item description
         - price: price of item, in USD
         - urls: Links to images of clothing item
-        - neighbours: The vertices that are adjacent to this vertex
+        - neighbour_list: The vertices that are adjacent to this vertex
+        - neighbour_weights: The edge weight for the neighbour at the same position
+            in neighbour_list
         - website: The link to the product informaiton on Zara website.
 
+    Private Instance Attributes:
+        - _token_ids: Sorted vocabulary ids of the filtered, lowercased description words,
+            computed once at creation
+        - _token_ids_with_name: _token_ids extended with the ids of the filtered item name words
+        - _token_hash: Hash of _token_ids, for cheap duplicate-description detection
+        - _self_score: The similarity score of this vertex's description against itself,
+            i.e. the score any identical description gets
+        - _nbr_index: Maps each neighbour to its position in neighbour_list, for updates
+
     Representation Invariants:
-        - self not in self.neighbours
-        - all(self in u.neighbours for u in self.neighbours)
+        - self not in self.neighbour_list
+        - all(self in u.neighbour_list for u in self.neighbour_list)
+        - len(self.neighbour_list) == len(self.neighbour_weights)
         - item_description != ''
     """
+    # no per-instance __dict__: with catalogs of thousands of vertices the
+    # dict overhead per vertex adds up to real memory
+    __slots__ = ('item_id', 'item_name', 'item_description', 'price', 'urls',
+                 'neighbour_list', 'neighbour_weights', 'website',
+                 '_token_ids', '_token_ids_with_name', '_token_hash', '_self_score', '_nbr_index')
+
     item_id: str
     item_name: str
     item_description: str
     price: float
     urls: list[str]
-    neighbours: dict[WeightedVertex, float]
+    neighbour_list: list[WeightedVertex]
+    neighbour_weights: list[float]
     website: str
+    _token_ids: np.ndarray
+    _token_ids_with_name: np.ndarray
+    _token_hash: int
+    _self_score: float
+    _nbr_index: dict[WeightedVertex, int]
 
     def __init__(self, item_id: str, item_name: str, item_description: str, price: float,
                  urls: list[str], website: str) -> None:
         """Initialize a new vertex with the given item."""
-        self.item_id = item_id
-        self.item_name = item_name
+        # intern the short, frequently repeated fields so colour variants of
+        # the same item share one string object
+        self.item_id = sys.intern(item_id)
+        self.item_name = sys.intern(item_name)
         self.item_description = item_description
         self.price = price
         self.urls = urls
-        self.neighbours = {}
-        self.website = website
+        self.neighbour_list = []
+        self.neighbour_weights = []
+        self._nbr_index = {}
+        self.website = sys.intern(website)
+
+        # Tokenize and filter the description once here so the O(V^2) pairwise
+        # comparisons in create_edge do not redo the work for every pair.
+        self._token_ids = _encode_tokens(filter_out_data(item_description))
+        if item_name != '':
+            name_ids = _encode_tokens(filter_out_data(item_name))
+            self._token_ids_with_name = np.union1d(self._token_ids, name_ids)
+        else:
+            self._token_ids_with_name = self._token_ids
+
+        # colour variants of the same item repeat the description verbatim, so
+        # create_edge can skip rescoring when the hashes (and tokens) match
+        self._token_hash = hash(self._token_ids.tobytes())
+        self._self_score = get_similarity_score(self._token_ids, self._token_ids)
+
+    def set_neighbour(self, other: WeightedVertex, weight: float) -> None:
+        """Add other as a neighbour with the given weight, or update the weight
+        if other is already a neighbour."""
+
+        i = self._nbr_index.get(other)
+        if i is None:
+            self._nbr_index[other] = len(self.neighbour_list)
+            self.neighbour_list.append(other)
+            self.neighbour_weights.append(weight)
+        else:
+            self.neighbour_weights[i] = weight
 
-    def get_ordered_neighbours(self) -> list[WeightedVertex]:
-        """Returns a list of the neighbours ordered by decreasing weights"""
+    def get_ordered_neighbours(self, k: int | None = None) -> list[WeightedVertex]:
+        """Returns a list of the neighbours ordered by decreasing weights.
 
-        n = dict(sorted(self.neighbours.items(), key=lambda i: -i[1]))
-        return list(n.keys())
+        If k is given, only the k highest-weighted neighbours are returned,
+        which avoids sorting the whole list."""
+
+        if k is not None:
+            top = heapq.nlargest(k, range(len(self.neighbour_list)), key=self.neighbour_weights.__getitem__)
+            return [self.neighbour_list[i] for i in top]
+
+        order = np.argsort(-np.asarray(self.neighbour_weights, dtype=np.float32))
+        return [self.neighbour_list[i] for i in order]
 
     def load_vertex_image(self) -> list[str]:
         """Returns urls of the given colthing item"""
@@ -71,15 +230,33 @@ class WeightedGraph:
     """A weighted graph storing all image data from the Zara dataset.
 
     Instance Attributes:
-        - vertices: The clothing items, mapped from corresponding item name
-
+        - vertex_list: The clothing items, in insertion (row-index) order
+
+    Private Instance Attributes:
+        - _index: Maps each item_id to its row index in vertex_list
+        - _csr: Packed adjacency matrix built by finalize(), or None if edges
+            changed since the last finalize (or scipy is not installed)
+        - _postings: Inverted index mapping each token id to the row indices of
+            the vertices containing that token
     """
 
-    vertices: dict[str, WeightedVertex]
+    vertex_list: list[WeightedVertex]
+    _index: dict[str, int]
+    _csr: Any
+    _postings: dict[int, list[int]]
 
     def __init__(self) -> None:
         """Initialize an empty graph (no vertices or edges)."""
-        self.vertices = {}
+        self.vertex_list = []
+        self._index = {}
+        self._csr = None
+        self._postings = {}
+
+    def get_vertex(self, item_id: str) -> WeightedVertex:
+        """Return the vertex with the given item_id.
+
+        Raise a KeyError if no vertex has that id."""
+        return self.vertex_list[self._index[item_id]]
 
     def add_vertex(self, item_id: str, item_name: str, item_description: str,
                    price: float, urls: list[str], website: str) -> None:
@@ -88,8 +265,32 @@ class WeightedGraph:
         The new vertex is not adjacent to any other vertices.
         Do nothing if the given item is already in this graph.
         """
-        if item_id not in self.vertices:
-            self.vertices[item_id] = WeightedVertex(item_id, item_name, item_description, price, urls, website)
+        if item_id not in self._index:
+            self._register(WeightedVertex(item_id, item_name, item_description, price, urls, website))
+
+    def add_and_link(self, item_id: str, item_name: str, item_description: str,
+                     price: float, urls: list[str], website: str, threshold: float = 0.0) -> None:
+        """Add a vertex with the given parameters and immediately link it to the
+        vertices already in the graph.
+
+        The description is tokenized once when the vertex is created, and the
+        same tokens drive both the inverted-index candidate lookup and the
+        batch scoring, so each item is parsed, tokenized and linked in a single
+        streaming pass. Do nothing if the given item is already in this graph."""
+
+        if item_id not in self._index:
+            v = WeightedVertex(item_id, item_name, item_description, price, urls, website)
+            self._link_new_vertex(v, include_names=False, threshold=threshold)
+
+    def _register(self, v: WeightedVertex) -> None:
+        """Append the given vertex to vertex_list, record its row index and add
+        its tokens to the inverted index."""
+
+        row = len(self.vertex_list)
+        self._index[v.item_id] = row
+        self.vertex_list.append(v)
+        for t in v._token_ids_with_name:
+            self._postings.setdefault(int(t), []).append(row)
 
     def add_edge(self, item_id1: Any, item_id2: Any, weight: float = 1) -> None:
         """Add an edge between the two vertices with the given item_ids in this graph,
@@ -102,19 +303,135 @@ class WeightedGraph:
         """
 
         # check if both vertices exist
-        if item_id1 in self.vertices and item_id2 in self.vertices:
-            v1 = self.vertices[item_id1]
-            v2 = self.vertices[item_id2]
+        if item_id1 in self._index and item_id2 in self._index:
+            v1 = self.get_vertex(item_id1)
+            v2 = self.get_vertex(item_id2)
 
             # Add the new edge
-            v1.neighbours[v2] = weight
-            v2.neighbours[v1] = weight
+            v1.set_neighbour(v2, weight)
+            v2.set_neighbour(v1, weight)
+            self._csr = None  # packed adjacency is stale now
         else:
             raise ValueError
 
+    def finalize(self) -> None:
+        """Pack the adjacency of the whole graph into a CSR sparse matrix keyed by
+        integer row index, so neighbour weights live in two contiguous arrays
+        instead of per-vertex lists.
+
+        Call after bulk edge construction; get_neighbours answers from the packed
+        matrix until the next add_edge. Does nothing when scipy is not installed."""
+
+        if not _SCIPY_AVAILABLE:
+            return
+
+        rows = []
+        cols = []
+        data = []
+        for i, v in enumerate(self.vertex_list):
+            for j in range(len(v.neighbour_list)):
+                rows.append(i)
+                cols.append(self._index[v.neighbour_list[j].item_id])
+                data.append(v.neighbour_weights[j])
+
+        n = len(self.vertex_list)
+        self._csr = sparse.csr_matrix((np.asarray(data, dtype=np.float32), (rows, cols)), shape=(n, n))
+
     def get_neighbours(self, item_id: str) -> list[WeightedVertex]:
         """Returns the neighbours of the vertex with the given id ordered by decreasing weight."""
-        return self.vertices[item_id].get_ordered_neighbours()
+
+        if self._csr is not None:
+            row = self._csr.getrow(self._index[item_id])
+            order = np.argsort(-row.data)
+            return [self.vertex_list[c] for c in row.indices[order]]
+
+        return self.get_vertex(item_id).get_ordered_neighbours()
+
+    def batch_scores(self, new_ids: np.ndarray, include_names: bool = True) -> np.ndarray:
+        """Return an array with the similarity score of the given token ids against
+        every vertex currently in this graph, in vertex_list order.
+
+        If include_names is True, each vertex is scored on its description plus
+        item name tokens (as when matching a user query); otherwise on the
+        description tokens only (as when comparing two catalog items).
+
+        Uses the compiled kernel over all vertices at once when Numba is available,
+        and falls back to scoring each vertex with get_similarity_score otherwise."""
+
+        return self._scores_for(new_ids, self.vertex_list, include_names)
+
+    def _scores_for(self, new_ids: np.ndarray, others: list[WeightedVertex],
+                    include_names: bool) -> np.ndarray:
+        """Return the similarity scores of the given token ids against each vertex
+        in others, in order. The shared implementation behind batch_scores and the
+        candidate-pruned path in create_clothing_item."""
+
+        out = np.zeros(len(others), dtype=np.float32)
+
+        if len(others) == 0:
+            return out
+
+        if _NUMBA_AVAILABLE:
+            # pack every vertex's token array into one flat array with offsets
+            token_arrays = [u._token_ids_with_name if include_names else u._token_ids for u in others]
+            offsets = np.zeros(len(others) + 1, dtype=np.int32)
+            offsets[1:] = np.cumsum([a.size for a in token_arrays])
+            flat_ids = np.concatenate(token_arrays)
+
+            colour_mask = np.zeros(len(_VOCAB), dtype=np.bool_)
+            colour_mask[_COLOUR_IDS] = True
+            clothes_mask = np.zeros(len(_VOCAB), dtype=np.bool_)
+            clothes_mask[_CLOTHES_IDS] = True
+
+            _score_kernel(new_ids, flat_ids, offsets, colour_mask, clothes_mask, out)
+        else:
+            for i in range(len(others)):
+                item_ids = others[i]._token_ids_with_name if include_names else others[i]._token_ids
+                out[i] = get_similarity_score(new_ids, item_ids)
+
+        return out
+
+    def build_all_edges(self, threshold: float = 0.0, max_workers: int | None = None) -> None:
+        """Compute the similarity score of every pair of vertices and add an edge
+        for each pair whose score exceeds threshold.
+
+        The build runs in two phases. Phase A scores one row per vertex in
+        parallel; batch_scores only reads the cached token arrays, so rows
+        share no mutable state. Phase B commits the edges in batches of
+        vertex-disjoint pairs (a greedy matching), so no two add_edge calls
+        running concurrently ever touch the same vertex."""
+
+        ids = [v.item_id for v in self.vertex_list]
+        n = len(ids)
+        if n < 2:
+            return
+
+        # Phase A: all pairwise scores, one row at a time
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            rows = list(pool.map(
+                lambda v: self.batch_scores(v._token_ids, include_names=False),
+                self.vertex_list))
+
+        # upper-triangle pairs that pass the threshold
+        remaining = [(i, j) for i in range(n) for j in range(i + 1, n) if rows[i][j] > threshold]
+
+        # Phase B: repeatedly peel off a matching (edges with unseen endpoints)
+        # and commit it in parallel
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while remaining:
+                used = set()
+                batch = []
+                rest = []
+                for i, j in remaining:
+                    if i not in used and j not in used:
+                        used.add(i)
+                        used.add(j)
+                        batch.append((i, j))
+                    else:
+                        rest.append((i, j))
+
+                list(pool.map(lambda p: self.add_edge(ids[p[0]], ids[p[1]], float(rows[p[0]][p[1]])), batch))
+                remaining = rest
 
     def create_clothing_item(self, item_description: str) -> WeightedVertex:
         """Add new vertex with given parameters to the weighted graph and calculate its neighbours
@@ -122,96 +439,127 @@ class WeightedGraph:
 
         item_id = str(uuid.uuid4())  # generate random id
         v = WeightedVertex(item_id, "", item_description, 0, [], '')
-        self.vertices[item_id] = v
-
-        for other_id in self.vertices:
-            create_edge(self, item_id, other_id)
+        self._link_new_vertex(v, include_names=True, threshold=0.0)
 
         return v
 
+    def _link_new_vertex(self, v: WeightedVertex, include_names: bool, threshold: float) -> None:
+        """Insert the given new vertex and add its edges to every existing vertex
+        scoring above threshold.
 
-def load_clothing_items(clothing_items_file: str) -> WeightedGraph:
-    """Create a weighted graph containing each clothing item from the file as vertices."""
+        Only vertices sharing at least one token with v can score above 0, so the
+        candidates come from the inverted index instead of scanning the whole
+        graph, and are scored in one batch."""
 
-    g = WeightedGraph()
+        candidate_rows = sorted({row for t in v._token_ids for row in self._postings.get(int(t), ())})
+        others = [self.vertex_list[row] for row in candidate_rows]
 
-    with open(clothing_items_file) as file:
-        reader = csv.reader(file)
-        for line in reader:
+        scores = self._scores_for(v._token_ids, others, include_names)
+        self._register(v)
 
-            # skip headers
-            if line[0] == "brand":
-                continue
+        for i in range(len(others)):
+            # zero-score candidates would only bloat the neighbour lists
+            if scores[i] > threshold:
+                self.add_edge(v.item_id, others[i].item_id, float(scores[i]))
 
-            # create vertex for each clothing item
-            urls = str_to_list(line[7])
-            g.add_vertex(line[2], line[3], line[4], float(line[5]), urls, line[1])
+
+def load_clothing_items(clothing_items_file: str, link_edges: bool = False,
+                        threshold: float = 0.0) -> WeightedGraph:
+    """Create a weighted graph containing each clothing item from the file as vertices.
+
+    If link_edges is True, each item is also scored and linked against the items
+    loaded before it as soon as its row is parsed, so the full similarity graph
+    comes out of the same single pass over the file (no separate all-pairs edge
+    phase). Only edges scoring above threshold are kept."""
+
+    g = WeightedGraph()
+
+    # pandas parses the file in C and only materializes the columns we use
+    df = pd.read_csv(clothing_items_file,
+                     usecols=['url', 'sku', 'name', 'description', 'price', 'images'],
+                     dtype={'price': 'float32'},
+                     keep_default_na=False)
+
+    # create vertex for each clothing item
+    for row in df.itertuples(index=False):
+        if link_edges:
+            g.add_and_link(row.sku, row.name, row.description, float(row.price),
+                           str_to_list(row.images), row.url, threshold)
+        else:
+            g.add_vertex(row.sku, row.name, row.description, float(row.price),
+                         str_to_list(row.images), row.url)
 
     return g
 
 
-def create_edge(g: WeightedGraph, id1: str, id2: str) -> None:
+def create_edge(g: WeightedGraph, id1: str, id2: str, threshold: float = 0.0) -> None:
     """Check the similarity of the vertices with the given ids
-    and add an edge if the score passes a certain threshold.
+    and add an edge if the score passes the given threshold.
 
     No edge is added if the ids are identical."""
 
     if id1 == id2:
         return
 
-    v1 = g.vertices[id1]
-    v2 = g.vertices[id2]
+    v1 = g.get_vertex(id1)
+    v2 = g.get_vertex(id2)
 
+    # identical descriptions (colour variants of one item) need no rescoring
+    if v1._token_hash == v2._token_hash and np.array_equal(v1._token_ids, v2._token_ids):
+        score = v2._self_score
     # calculate similarity score of two vertices
-    if v1.item_name == '':
-        score = get_similarity_score(v1.item_description, v2.item_description + v2.item_name)
+    elif v1.item_name == '':
+        score = get_similarity_score(v1._token_ids, v2._token_ids_with_name)
     elif v2.item_name == '':
-        score = get_similarity_score(v1.item_description + v1.item_name, v2.item_description)
+        score = get_similarity_score(v1._token_ids_with_name, v2._token_ids)
     else:
-        score = get_similarity_score(v1.item_description, v2.item_description)
-
-    # add edge
-    g.add_edge(v1.item_id, v2.item_id, score)
+        score = get_similarity_score(v1._token_ids, v2._token_ids)
 
+    # add edge, unless the pair has nothing in common: a zero-weight edge only
+    # bloats the neighbour lists that get_ordered_neighbours later has to sort
+    if score > threshold:
+        g.add_edge(v1.item_id, v2.item_id, score)
 
-def get_similarity_score(user_desc: str, item_desc: str) -> float:
-    """Return the similarity score between the two given texts.
-    The similarity score is calculated as so:
-    The synonyms for each generated image description (from the user's image) are generated
-    Then item_desc is generated """
 
-    colours = ['black', 'white', 'gold', 'silver', 'blue', 'red', 'orange', 'yellow', 'green', 'purple', 'pink',
-               'brown', 'tan', 'beige']
-    clothes = ['shirt', 'short', 'skirt', 'dress', 'jacket', 'pants', 'leggings', 'jeans', 'top', 'bottom', 'sweater',
-               'crop top', 'vest', 'underwear', 'shorts', 'sneakers', 'shoes']
+def get_similarity_score(user_ids: np.ndarray, item_ids: np.ndarray) -> float:
+    """Return the similarity score between the two given token id arrays.
 
-    # dataset description
-    zara_txt = filter_out_data(item_desc)
+    The arrays are the sorted vocabulary ids cached on each vertex, so no
+    tokenization happens here. Words appearing in both arrays add to the score,
+    with colour and clothing words weighted more heavily. The whole comparison
+    runs as NumPy array operations rather than a per-word Python loop."""
 
-    score = 0
+    if item_ids.size == 0:
+        return 0
 
-    for word in zara_txt:
-        if str.lower(word) in user_desc:
-            if word in colours:
-                score += 1
-            if word in clothes:
-                score += 3
-            score += 1
+    matched = item_ids[np.isin(item_ids, user_ids, assume_unique=True)]
+    score = (matched.size
+             + np.isin(matched, _COLOUR_IDS, assume_unique=True).sum()
+             + 3 * np.isin(matched, _CLOTHES_IDS, assume_unique=True).sum())
 
-    if len(zara_txt) > 0:
-        return score / len(zara_txt)
-    else:
-        return 0
+    return score / item_ids.size
 
 
 def str_to_list(text: str) -> list[str]:
     """Takes in a string representation of a list of strings and converts them into a list of strings."""
 
-    lst = text[1:-1].split(", ")         # remove brackets and split by comma
-    for i in range(len(lst)):
-        lst[i] = lst[i][1:-1]            # remove quotations
+    # the dataset stores the urls as a Python list literal, so parse it directly
+    # instead of stripping brackets and quotes element by element
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        # fall back to pulling out the quoted strings in one regex pass
+        return _URL_RE.findall(text)
+
 
-    return lst
+@functools.lru_cache(maxsize=None)
+def _synonyms_cached(word: str) -> list[str]:
+    """Return the lemma names of every WordNet synset of the given word.
+
+    Cached because the colour/clothing vocabulary repeats constantly and
+    WordNet database lookups dominate synonym_extractor's cost."""
+
+    return [lem.name() for syn in wordnet.synsets(word) for lem in syn.lemmas()]
 
 
 def synonym_extractor(phrase: str) -> list[str]:
@@ -223,14 +571,10 @@ def synonym_extractor(phrase: str) -> list[str]:
 
     for word in phrase:
         word_lst.append(word)
-        if word in ['black', 'white', 'blue', 'pink', 'purple', 'yellow', 'red', 'orange', 'green', 'gold', 'silver']:
+        if word in _COLOURS:
             word_lst.append(word)
             continue
-        s = []
-        for syn in wordnet.synsets(word):
-            for lem in syn.lemmas():
-                s.append(lem.name())
-        word_lst.extend(s)
+        word_lst.extend(_synonyms_cached(word))
 
     return word_lst
 
@@ -239,26 +583,39 @@ def filter_out_user(user_description: str) -> list:
     """Filtering out 'stopwords' for the user description
     - aka words that are not important to the clothing item's description
     """
-    clothes = ['shirt', 'short', 'skirt', 'dress', 'jacket', 'pants', 'leggings', 'jeans', 'top', 'bottom', 'sweater',
-               'crop top', 'vest', 'underwear', 'shorts', 'sneakers', 'shoes']
+    return filter_out_user_batch([user_description])[0]
 
-    word_tokens = word_tokenize(user_description)
-    stop_words = set(stopwords.words('english'))
 
-    filtered_sentence = []
+def filter_out_user_batch(user_descriptions: list[str]) -> list[list[str]]:
+    """Filter several user descriptions at once, returning one filtered list per
+    description in order.
 
-    for w in word_tokens:
-        if w not in stop_words:
-            filtered_sentence.append(w)
+    All descriptions are POS-tagged in a single nltk.pos_tag_sents call, which
+    amortizes the tagger's setup across the batch instead of paying it once per
+    description."""
+
+    filtered_sentences = []
+
+    for user_description in user_descriptions:
+        filtered_sentence = []
+
+        # lowercased once here, same as filter_out_data
+        for w in _TOKEN_RE.findall(user_description):
+            w = w.lower()
+            if w not in _STOP_WORDS:
+                filtered_sentence.append(w)
+
+        filtered_sentences.append(filtered_sentence)
+
+    tagged = nltk.pos_tag_sents(filtered_sentences)
 
-    clothes_in_description = []
-    for things in filtered_sentence:
-        if things in clothes:
-            clothes_in_description.append(things)
+    results = []
+    for filtered_sentence, tags in zip(filtered_sentences, tagged):
+        clothes_in_description = [things for things in filtered_sentence if things in _CLOTHES]
+        adjectives = [word for word, t in tags if t == 'JJ']
+        results.append(adjectives + clothes_in_description)
 
-    tags = nltk.pos_tag(filtered_sentence)
-    adjectives = [word for word, t in tags if t == 'JJ']
-    return adjectives + clothes_in_description
+    return results
 
 
 def filter_out_data(item_desc: str) -> list[str]:
@@ -267,13 +624,14 @@ def filter_out_data(item_desc: str) -> list[str]:
     """
 
     # JUST FOR THE ZARA DESCRIPTION
-    stop_words = set(stopwords.words('english'))
-    word_tokens = word_tokenize(item_desc)
+    word_tokens = _TOKEN_RE.findall(item_desc)
 
     filtered_sentence = []
 
+    # lowercase each token exactly once here, so no caller has to do it again
     for w in word_tokens:
-        if w not in stop_words:
+        w = w.lower()
+        if w not in _STOP_WORDS:
             filtered_sentence.append(w)
 
     return filtered_sentence
@@ -46,7 +46,7 @@ class StyleMatch:
         self.dataset = dataset
 
         # initialize items to be a list of 5 random vertices
-        self.items = random.sample(list(self.graph.vertices.values()), 5)
+        self.items = random.sample(self.graph.vertex_list, 5)
 
         # create window and widgets
         self.window = Tk()
@@ -151,16 +151,13 @@ class StyleMatch:
         """Update items to be a list of the clothing items most similar to the given item_description
         as Weighted Vertices."""
 
-        # create graph and new vertex
+        # create graph and new vertex; create_clothing_item scores the new vertex
+        # against the whole catalog in one batch and adds the edges itself
         self.graph = g.load_clothing_items(self.dataset)
         user_vertex = self.graph.create_clothing_item(item_description)
 
-        # create edges
-        for vertex in self.graph.vertices:
-            g.create_edge(self.graph, user_vertex.item_id, self.graph.vertices[vertex].item_id)
-
         # get top 5 similar items and update items and labels
-        self.items = user_vertex.get_ordered_neighbours()[:5]
+        self.items = user_vertex.get_ordered_neighbours(5)
         self.update_labels()
 
     def find_similar_from_image(self, file_location: str) -> None: